@@ -4,6 +4,8 @@ Has functions that help me when multiprocessing.
 """
 
 # Imports
+import os
+import queue
 import typing
 
 import numpy as np
@@ -11,8 +13,9 @@ import multiprocessing as mp
 
 # Sub imports
 import multiprocessing.queues
-import multiprocessing.managers
+import multiprocessing.sharedctypes
 import multiprocessing.shared_memory
+import multiprocessing.resource_tracker
 
 # Public classes
 __all__ = ['MultiProcessing']
@@ -24,6 +27,8 @@ class SharedMemoryList(list):
     objects. It inherits from the list class so that the instance itself it a list.
     """
 
+    __slots__ = ()  # no instance __dict__ (only the list items are needed)
+
     def __init__(
             self,
             shm: list[mp.shared_memory.SharedMemory] | mp.shared_memory.SharedMemory,
@@ -39,17 +44,49 @@ class SharedMemoryList(list):
     
     def close(self) -> None:
         """
-        Calls the .close() method on each shared memory object inside the list.
+        Calls the .close() method on each shared memory object inside the list. Every object is
+        closed even if one of them raises an error (the first error is raised at the end).
         """
 
-        for memory in self: memory.close()
+        self._call_all('close')
     
     def unlink(self) -> None:
         """
-        Calls the .unlink() method on each shared memory object inside the list.
+        Calls the .unlink() method on each shared memory object inside the list. Every object is
+        unlinked even if one of them raises an error (the first error is raised at the end).
         """
 
-        for memory in self: memory.unlink()
+        self._call_all('unlink')
+
+    def _call_all(self, method: str) -> None:
+        """
+        Calls the given method on each shared memory object inside the list so that an error for
+        one of them doesn't leak the others.
+
+        Args:
+            method (str): the name of the shared memory object method to call.
+
+        Raises:
+            Exception: the first error raised by one of the calls.
+        """
+
+        error = None
+        for memory in self:
+            try:
+                getattr(memory, method)()
+            except Exception as e:
+                if error is None: error = e
+        if error is not None: raise error
+
+
+class SharedMemoryResult(dict):
+    """
+    Private class to mark a process result that was saved inside a shared memory object. It
+    inherits from the dict class so that the instance itself is the shared memory information
+    dictionary gotten from MultiProcessing.create_shared_memory().
+    """
+
+    __slots__ = ()  # no instance __dict__ as the instance is pickled through the output queue
 
 
 class MultiProcessing:
@@ -71,6 +108,9 @@ class MultiProcessing:
             transfer_all_data: bool = False,
             identifier: bool = False,
             while_True: bool = False,       
+            pin_processes: bool = False,
+            start_method: str | None = None,
+            in_main_process: bool = False,
             verbose: int = 0, 
         ) -> list:
         """
@@ -87,12 +127,15 @@ class MultiProcessing:
                 cls.create_shared_memory(). 
             function (typing.Callable[..., any]): the function to be multiprocessed.
             function_kwargs (dict[str, any]): the multiprocessed function's keyword arguments.
-            processes (int): the number of processes used in the multiprocessing.
+            processes (int): the number of processes used in the multiprocessing. Even when only
+                one process is needed (i.e. processes=1 or only one data item), the function is run
+                in a subprocess unless 'in_main_process' is set to True.
             shared_memory_input (bool, optional): if the input data is actually a shared memory
                 information dictionary gotten from cls.shared_memory. Defaults to False.
             create_shared_memory (bool, optional): deciding to create a shared memory object for
                 the data. In this case, the data given to the subprocesses is the view to the
-                buffer of the inputted data. Defaults to False.
+                buffer of the inputted data. Not created when the function is run in the main
+                process (cf. 'in_main_process'). Defaults to False.
             multiple_shared_memory (bool, optional): deciding to create a list of shared memory
                 objects as opposed to only one. Useful when the inputted data is a list of ndarrays
                 of different shapes. If the inputted data is a list and 'multiple_shared_memory' is
@@ -110,6 +153,21 @@ class MultiProcessing:
                 outputted list has the "shape" (nb_processes, corresponding section size, ...).
                 When kept False, the resulting list will have the same "shape" than the initial
                 data, i.e. len(outputted_list) == len(input_data). Defaults to False.
+            pin_processes (bool, optional): deciding to pin each subprocess to one CPU core (in a
+                round-robin way) so that the OS doesn't migrate them between cores. Only used on
+                systems having os.sched_setaffinity (i.e. Linux). Defaults to False.
+            start_method (str | None, optional): the multiprocessing start method used to create
+                the subprocesses ('fork', 'spawn' or 'forkserver'). 'forkserver' is safer than
+                'fork' when the main process uses threads while staying faster than 'spawn'. With
+                'spawn' and 'forkserver', the function to be multiprocessed needs to be importable
+                and the data is pickled (if not using shared memory). When None, the default
+                start method is used. Defaults to None.
+            in_main_process (bool, optional): when only one process is needed, deciding to directly
+                run the function in the main process (no process creation and no pickling of the
+                inputs and outputs). In that case, the function works on the inputted data itself
+                (i.e. in-place changes are seen by the caller), 'start_method' and 'pin_processes'
+                are not used, and any side effect or crash of the function happens in the main
+                process. Defaults to False.
             verbose (int, optional): the higher the value, the more prints will be outputted. When
                 0, no prints. Defaults to 0.
 
@@ -130,6 +188,9 @@ class MultiProcessing:
             transfer_all_data=transfer_all_data,
             identifier=identifier,
             while_True=while_True,
+            pin_processes=pin_processes,
+            start_method=start_method,
+            in_main_process=in_main_process,
             verbose=verbose,
         )
         return instance.multiprocess_choices()
@@ -189,19 +250,25 @@ class MultiProcessing:
             ]: information needed to access the shared memory object(s).
         """
 
-        if multiple:
-            shm, info = MultiProcessingUtils.shared_memory_multiple(data)
-
-        elif isinstance(data, list):
-            try: 
-                data = np.ndarray(data)
+        # List conversion (done once so that homogeneous data ends up in a unique buffer)
+        if isinstance(data, list) and not multiple:
+            try:
+                array = np.asarray(data)  # raises for ragged lists
             except Exception:
+                array = None
+
+            if array is not None and not array.dtype.hasobject:
+                data = array
+            else:
                 if verbose > 0:
                     print(
-                        "\033[37mShared_memory function couldn't change data to an ndarray."
+                        "\033[37mShared_memory function couldn't change data to an ndarray. "
                         "Creating multiple shared memories.\033[0m"
                     )
-                shm, info = MultiProcessingUtils.shared_memory_multiple(data)
+                multiple = True
+
+        if multiple:
+            shm, info = MultiProcessingUtils.shared_memory_multiple(data)
         else:
             # Initialisations
             shm = mp.shared_memory.SharedMemory(create=True, size=data.nbytes)
@@ -267,6 +334,10 @@ class MultiProcessingUtils:
     To store some private functions.
     """
 
+    # Minimum size (in bytes) of an np.ndarray result for it to be sent through shared memory.
+    # Read when an instance is created and then given to the processes as an argument.
+    shared_memory_output_size: int = 2 ** 20
+
     def __init__(
             self,
             input_data: list | np.ndarray | dict[str, any],
@@ -279,6 +350,9 @@ class MultiProcessingUtils:
             transfer_all_data: bool,
             identifier: bool,
             while_True: bool,    
+            pin_processes: bool,
+            start_method: str | None,
+            in_main_process: bool,
             verbose: int,
         ) -> None:
         """
@@ -317,6 +391,12 @@ class MultiProcessingUtils:
                 outputted list has the "shape" (nb_processes, corresponding section size, ...).
                 When kept False, the resulting list will have the same "shape" than the initial
                 data, i.e. len(outputted_list) == len(input_data).
+            pin_processes (bool): deciding to pin each subprocess to one CPU core (in a round-robin
+                way) so that the OS doesn't migrate them between cores.
+            start_method (str | None): the multiprocessing start method used to create the
+                subprocesses. When None, the default start method is used.
+            in_main_process (bool): when only one process is needed, deciding to directly run the
+                function in the main process instead of in a subprocess.
             verbose (int): the higher the value, the more prints will be outputted. When 0, no
                 prints.
         """
@@ -331,6 +411,8 @@ class MultiProcessingUtils:
         self.transfer_all_data = transfer_all_data
         self.identifier = identifier
         self.while_true = while_True
+        self.pin_processes = pin_processes and hasattr(os, 'sched_setaffinity')
+        self.context = mp.get_context(start_method)
         self.verbose = verbose
 
         # Created arguments
@@ -339,6 +421,11 @@ class MultiProcessingUtils:
         else:
             self.data_len = len(self.input_data)
         self.nb_processes = min(self.data_len, processes)
+        self.main_process = in_main_process and self.nb_processes == 1
+        # Results from the main process don't need to go through shared memory
+        self.output_size: int | None = (
+            None if self.main_process else MultiProcessingUtils.shared_memory_output_size
+        )
 
     def multiprocess_choices(self) -> list:
         """
@@ -353,11 +440,17 @@ class MultiProcessingUtils:
 
         # Basic setup
         shm = None
-        manager = mp.Manager()
-        output_queue = manager.Queue()
+        # No pickling needed for the results when running in the main process
+        output_queue = queue.SimpleQueue() if self.main_process else self.context.Queue()
+
+        # Shared tracker so that the processes' shared memory results aren't seen as leaked
+        if os.name == 'posix': mp.resource_tracker.ensure_running()
 
-        # Shared memory setup 
-        if self.create_shared_memory:
+        # Shared memory setup (not needed when running in the main process)
+        if self.main_process:
+            if self.shared_memory_input:
+                shm, self.input_data = MultiProcessing.open_shared_memory(self.input_data)
+        elif self.create_shared_memory:
             if not self.shared_memory_input: 
                 shm, self.input_data = MultiProcessing.create_shared_memory(
                     data=self.input_data,
@@ -369,35 +462,66 @@ class MultiProcessingUtils:
 
 
         # Choose method
-        if self.while_true:
-            shared_value = manager.Value('i', 0)
-            print('shared value created', flush=True)
-            if self.transfer_all_data:
-                self._multiprocess_while_all_data(shared_value, output_queue)
+        processes = []
+        try:
+            if self.while_true:
+                shared_value = self.context.Value('i', 0)
+                if self.transfer_all_data:
+                    processes = self._multiprocess_while_all_data(shared_value, output_queue)
+                else:
+                    processes = self._multiprocess_while(shared_value, output_queue)
+
+                results = [None] * self.data_len
             else:
-                self._multiprocess_while(shared_value, output_queue)
-
-            results = [None] * self.data_len
-        else:
-            if self.transfer_all_data: 
-                self._multiprocess_indexes_all_data(output_queue)
+                if self.transfer_all_data: 
+                    processes = self._multiprocess_indexes_all_data(output_queue)
+                else:
+                    processes = self._multiprocess_indexes(output_queue)
+
+                results = [None] * self.nb_processes
+            
+            # Get results (one queue item per process, before the join so the queue empties)
+            processes = [p for p in processes if p is not None]  # None when run in main process
+            if self.main_process:
+                # Results from the main process were neither pickled nor packed
+                item = output_queue.get()
+                if self.while_true:
+                    for identifier, result in item: results[identifier] = result
+                else:
+                    results[item[0]] = item[1]
+
+                # The results can be views of the shared memory buffer(s) closed below
+                if shm is not None:
+                    results = [
+                        MultiProcessingUtils._copy_view(result, self.input_data)
+                        for result in results
+                    ]
+            elif self.while_true:
+                for _ in range(self.nb_processes):
+                    for identifier, result in self._get_output(output_queue, processes):
+                        results[identifier] = MultiProcessingUtils._unpack_output(result)
             else:
-                self._multiprocess_indexes(output_queue)
-
-            results = [None] * self.nb_processes
-        
-        # Get results
-        while not output_queue.empty():
-            identifier, result = output_queue.get()
-            results[identifier] = result
-        
-        # Manage buffer(s)
-        if shm is not None:
-            shm.close()
-            if self.create_shared_memory and not self.shared_memory_input: shm.unlink()
+                for _ in range(self.nb_processes):
+                    identifier, result = self._get_output(output_queue, processes)
+                    results[identifier] = MultiProcessingUtils._unpack_output(result)
+            for p in processes: p.join()
+
+        except BaseException:
+            # Shared memory results still pending would otherwise leak
+            processes = [p for p in processes if p is not None]
+            for p in processes: p.terminate()
+            MultiProcessingUtils._discard_outputs(output_queue)
+            for p in processes: p.join()
+            raise
+
+        finally:
+            # Manage buffer(s)
+            if shm is not None:
+                shm.close()
+                if self.create_shared_memory and not self.shared_memory_input: shm.unlink()
         return results
     
-    def _multiprocess_indexes_all_data(self, output_queue: mp.queues.Queue) -> None:
+    def _multiprocess_indexes_all_data(self, output_queue: mp.queues.Queue) -> list[mp.Process]:
         """
         Multiprocessing by using sections of the data to leverage as much as possible operations
         written in C (e.g. np.ndarray multiplications). In this case, all the data is given as
@@ -406,6 +530,10 @@ class MultiProcessingUtils:
 
         Args:
             output_queue (mp.queues.Queue): the results gotten from the multiprocessing.
+
+        Returns:
+            list[mp.Process]: the started processes. They still need to be joined once their
+                results are taken from the output queue.
         """
 
         # Initial setup
@@ -414,42 +542,46 @@ class MultiProcessingUtils:
 
         if self.identifier:
             for i, index in enumerate(indexes):
-                p = mp.Process(
+                processes[i] = self._start_process(
+                    index=i,
                     target=self._multiprocessing_indexes_sub_with_indexes_all_data,
                     kwargs={
                         'data': self.input_data,
                         'function': self.function,
                         'function_kwargs': self.function_kwargs,
                         'output_queue': output_queue,
+                        'output_size': self.output_size,
                         'identifier': i,
                         'index': index,
                     },
                 )
-                p.start()
-                processes[i] = p
         else:
             for i in range(self.nb_processes):
-                p = mp.Process(
+                processes[i] = self._start_process(
+                    index=i,
                     target=self._multiprocessing_indexes_sub_without_indexes_all_data,
                     kwargs={
                         'data': self.input_data,
                         'function': self.function,
                         'function_kwargs': self.function_kwargs,
                         'output_queue': output_queue,
+                        'output_size': self.output_size,
                         'identifier': i,
                     },
                 )
-                p.start()
-                processes[i] = p
-        for p in processes: p.join()
+        return processes
 
-    def _multiprocess_indexes(self, output_queue: mp.queues.Queue) -> None:
+    def _multiprocess_indexes(self, output_queue: mp.queues.Queue) -> list[mp.Process]:
         """
         Multiprocessing by using sections of the data to leverage as much as possible operations
         written in C (e.g. np.ndarray multiplications).
 
         Args:
             output_queue (mp.queues.Queue): the results gotten from the multiprocessing.
+
+        Returns:
+            list[mp.Process]: the started processes. They still need to be joined once their
+                results are taken from the output queue.
         """
 
         # Initial setup
@@ -459,65 +591,71 @@ class MultiProcessingUtils:
         if isinstance(self.input_data, dict) and ('name' in self.input_data.keys()):
             if self.identifier:
                 for i, index in enumerate(indexes):
-                    p = mp.Process(
+                    processes[i] = self._start_process(
+                        index=i,
                         target=self._multiprocessing_indexes_sub_with_indexes_dict,
                         kwargs={
                             'data': self.input_data,
                             'function': self.function,
                             'function_kwargs': self.function_kwargs,
                             'output_queue': output_queue,
+                            'output_size': self.output_size,
                             'identifier': i,
                             'index': index,
                         },
                     )
-                    p.start()
-                    processes[i] = p
             else:
                 for i, index in enumerate(indexes):
-                    p = mp.Process(
+                    processes[i] = self._start_process(
+                        index=i,
                         target=self._multiprocessing_indexes_sub_without_indexes_dict,
                         kwargs={
                             'data': self.input_data,
                             'function': self.function,
                             'function_kwargs': self.function_kwargs,
                             'output_queue': output_queue,
+                            'output_size': self.output_size,
                             'identifier': i,
+                            'index': index,
                         },
                     )
-                    p.start()
-                    processes[i] = p
         else:
+            # Data sections (a single process gets all the data, so no slice copy is needed)
+            if self.nb_processes == 1:
+                sections = [self.input_data]
+            else:
+                sections = [self.input_data[index[0]:index[1] + 1] for index in indexes]
 
             if self.identifier:
                 for i, index in enumerate(indexes):
-                    p = mp.Process(
+                    processes[i] = self._start_process(
+                        index=i,
                         target=self._multiprocessing_indexes_sub_with_indexes,
                         kwargs={
-                            'data': self.input_data[index[0]:index[1] + 1],
+                            'data': sections[i],
                             'function': self.function,
                             'function_kwargs': self.function_kwargs,
                             'output_queue': output_queue,
+                            'output_size': self.output_size,
                             'identifier': i,
                             'index': index,
                         },
                     )
-                    p.start()
-                    processes[i] = p
             else:
                 for i, index in enumerate(indexes):
-                    p = mp.Process(
+                    processes[i] = self._start_process(
+                        index=i,
                         target=self._multiprocessing_indexes_sub_without_indexes,
                         kwargs={
-                            'data': self.input_data[index[0]:index[1] + 1],
+                            'data': sections[i],
                             'function': self.function,
                             'function_kwargs': self.function_kwargs,
                             'output_queue': output_queue,
+                            'output_size': self.output_size,
                             'identifier': i,
                         },
                     )
-                    p.start()
-                    processes[i] = p
-        for p in processes: p.join()
+        return processes
 
     @staticmethod
     def _multiprocessing_indexes_sub_without_indexes_all_data(
@@ -525,6 +663,7 @@ class MultiProcessingUtils:
             function: typing.Callable[..., any],
             function_kwargs: dict[str, any],
             output_queue: mp.queues.Queue,
+            output_size: int | None,
             identifier: int,
     ) -> None:
         """
@@ -535,6 +674,8 @@ class MultiProcessingUtils:
             function (typing.Callable[..., any]): the function used in the multiprocessing.
             function_kwargs (dict[str, any]): the function keyword arguments.
             output_queue (mp.queues.Queue): to get the results outside the function.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
             identifier (int): the identifier to know which section of the main data is being
                 multiprocessed.
         """
@@ -544,9 +685,9 @@ class MultiProcessingUtils:
             shm, data = MultiProcessing.open_shared_memory(data)
 
         result = function(data, **function_kwargs)  #TODO: won't work for a list[np.ndarray]...
-        output_queue.put((identifier, result))
+        output_queue.put((identifier, MultiProcessingUtils._pack_output(result, output_size)))
 
-        if shm is not None: shm.close()
+        if shm is not None: MultiProcessingUtils._close_shared_memory(shm, output_queue)
 
     @staticmethod
     def _multiprocessing_indexes_sub_with_indexes_all_data(
@@ -554,6 +695,7 @@ class MultiProcessingUtils:
             function: typing.Callable[..., any],
             function_kwargs: dict[str, any],
             output_queue: mp.queues.Queue,
+            output_size: int | None,
             identifier: int,
             index: tuple[int, int],
     ) -> None:
@@ -565,6 +707,8 @@ class MultiProcessingUtils:
             function (typing.Callable[..., any]): the function used in the multiprocessing.
             function_kwargs (dict[str, any]): the function keyword arguments.
             output_queue (mp.queues.Queue): to get the results outside the function.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
             identifier (int): the identifier to know which section of the main data is being 
                 multiprocessed.
         """
@@ -574,9 +718,9 @@ class MultiProcessingUtils:
             shm, data = MultiProcessing.open_shared_memory(data)
         
         result = function(data, index,  **function_kwargs)  #TODO: won't work for list[ndarray]...
-        output_queue.put((identifier, result))
+        output_queue.put((identifier, MultiProcessingUtils._pack_output(result, output_size)))
 
-        if shm is not None: shm.close()
+        if shm is not None: MultiProcessingUtils._close_shared_memory(shm, output_queue)
 
     @staticmethod
     def _multiprocessing_indexes_sub_without_indexes(
@@ -584,6 +728,7 @@ class MultiProcessingUtils:
             function: typing.Callable[..., any],
             function_kwargs: dict[str, any],
             output_queue: mp.queues.Queue,
+            output_size: int | None,
             identifier: int,
     ) -> None:
         """
@@ -594,12 +739,14 @@ class MultiProcessingUtils:
             function (typing.Callable[..., any]): the function used in the multiprocessing.
             function_kwargs (dict[str, any]): the function keyword arguments.
             output_queue (mp.queues.Queue): to get the results outside the function.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
             identifier (int): the identifier to know which section of the main data is being
                 multiprocessed.
         """
         
         result = function(data, **function_kwargs)  #TODO: won't work for list[np.ndarray]...
-        output_queue.put((identifier, result))
+        output_queue.put((identifier, MultiProcessingUtils._pack_output(result, output_size)))
 
     @staticmethod
     def _multiprocessing_indexes_sub_with_indexes(
@@ -607,6 +754,7 @@ class MultiProcessingUtils:
             function: typing.Callable[..., any],
             function_kwargs: dict[str, any],
             output_queue: mp.queues.Queue,
+            output_size: int | None,
             identifier: int,
             index: tuple[int, int],
     ) -> None:
@@ -618,12 +766,14 @@ class MultiProcessingUtils:
             function (typing.Callable[..., any]): the function used in the multiprocessing.
             function_kwargs (dict[str, any]): the function keyword arguments.
             output_queue (mp.queues.Queue): to get the results outside the function.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
             identifier (int): the identifier to know which section of the main data is being
                 multiprocessed.
         """
         
         result = function(data, index, **function_kwargs)  #TODO: won't work for list[ndarray]...
-        output_queue.put((identifier, result))
+        output_queue.put((identifier, MultiProcessingUtils._pack_output(result, output_size)))
 
     @staticmethod
     def _multiprocessing_indexes_sub_without_indexes_dict(
@@ -631,6 +781,7 @@ class MultiProcessingUtils:
             function: typing.Callable[..., any],
             function_kwargs: dict[str, any],
             output_queue: mp.queues.Queue,
+            output_size: int | None,
             identifier: int,
             index: tuple[int, int],
     ) -> None:
@@ -642,6 +793,8 @@ class MultiProcessingUtils:
             function (typing.Callable[..., any]): the function used in the multiprocessing.
             function_kwargs (dict[str, any]): the function keyword arguments.
             output_queue (mp.queues.Queue): to get the results outside the function.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
             identifier (int): the identifier to know which section of the main data is being
                 multiprocessed.
         """
@@ -649,9 +802,9 @@ class MultiProcessingUtils:
         shm, data = MultiProcessing.open_shared_memory(data)
         
         result = function(data[index[0]:index[1] + 1], **function_kwargs)
-        output_queue.put((identifier, result))
+        output_queue.put((identifier, MultiProcessingUtils._pack_output(result, output_size)))
 
-        shm.close()
+        MultiProcessingUtils._close_shared_memory(shm, output_queue)
 
     @staticmethod
     def _multiprocessing_indexes_sub_with_indexes_dict(
@@ -659,6 +812,7 @@ class MultiProcessingUtils:
             function: typing.Callable[..., any],
             function_kwargs: dict[str, any],
             output_queue: mp.queues.Queue,
+            output_size: int | None,
             identifier: int,
             index: tuple[int, int],
     ) -> None:
@@ -671,6 +825,8 @@ class MultiProcessingUtils:
             function (typing.Callable[..., any]): the function used in the multiprocessing.
             function_kwargs (dict[str, any]): the function keyword arguments.
             output_queue (mp.queues.Queue): to get the results outside the function.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
             identifier (int): the identifier to know which section of the main data is being
                 multiprocessed.
             index (tuple[int, int]): the indexes for the section of the data that is being
@@ -680,15 +836,15 @@ class MultiProcessingUtils:
         shm, data = MultiProcessing.open_shared_memory(data)
 
         result = function(data[index[0]:index[1] + 1], index, **function_kwargs)
-        output_queue.put((identifier, result))
+        output_queue.put((identifier, MultiProcessingUtils._pack_output(result, output_size)))
 
-        shm.close()
+        MultiProcessingUtils._close_shared_memory(shm, output_queue)
 
     def _multiprocess_while_all_data(
             self,
-            shared_value: mp.managers.ValueProxy,
+            shared_value: mp.sharedctypes.Synchronized,
             output_queue: mp.queues.Queue,
-        ) -> None:
+        ) -> list[mp.Process]:
         """ #TODO:change docstring
         Multiprocessing all the data using a while loop. This means that the function to be
         multiprocessed should only take one index of the main data as the first function argument. 
@@ -701,6 +857,10 @@ class MultiProcessingUtils:
                 processed.
             output_queue (mp.queues.Queue): to save the identifier and the corresponding result
                 from the multiprocessing.
+
+        Returns:
+            list[mp.Process]: the started processes. They still need to be joined once their
+                results are taken from the output queue.
         """
 
         # Initial setup
@@ -710,42 +870,44 @@ class MultiProcessingUtils:
         if self.identifier:
             # Run
             for i in range(self.nb_processes):
-                p = mp.Process(
+                processes[i] = self._start_process(
+                    index=i,
                     target=self._multiprocessing_while_sub_with_indexes_all_data,
                     kwargs={
                         'input_function': self.function,
                         'function_kwargs': self.function_kwargs,
                         'data': self.input_data,
                         'data_len': self.data_len,
+                        'nb_processes': self.nb_processes,
                         'shared_value': shared_value,
                         'output_queue': output_queue,
+                        'output_size': self.output_size,
                     },
                 )
-                p.start()
-                processes[i] = p
         else:
             # Run
             for i in range(self.nb_processes):
-                p = mp.Process(
+                processes[i] = self._start_process(
+                    index=i,
                     target=self._multiprocessing_while_sub_without_indexes_all_data,
                     kwargs={
                         'input_function': self.function,
                         'function_kwargs': self.function_kwargs,
                         'data': self.input_data,
                         'data_len': self.data_len,
+                        'nb_processes': self.nb_processes,
                         'shared_value': shared_value,
                         'output_queue': output_queue,
+                        'output_size': self.output_size,
                     },
                 )
-                p.start()
-                processes[i] = p
-        for p in processes: p.join()
+        return processes
 
     def _multiprocess_while(
             self,
-            shared_value: mp.managers.ValueProxy,
+            shared_value: mp.sharedctypes.Synchronized,
             output_queue: mp.queues.Queue,
-        ) -> None:
+        ) -> list[mp.Process]:
         """
         Multiprocessing all the data using a while loop. This means that the function to be
         multiprocessed should only take one index of the main data as the first function argument. 
@@ -754,6 +916,10 @@ class MultiProcessingUtils:
             input_queue (mp.queues.Queue): an empty queue to be populated.
             output_queue (mp.queues.Queue): to save the identifier and the corresponding result
                 from the multiprocessing.
+
+        Returns:
+            list[mp.Process]: the started processes. They still need to be joined once their
+                results are taken from the output queue.
         """
 
         # Initial setup
@@ -761,37 +927,38 @@ class MultiProcessingUtils:
 
         # Run
         if self.identifier:
-            print('here is done also', flush=True)
             for i in range(self.nb_processes):
-                p = mp.Process(
+                processes[i] = self._start_process(
+                    index=i,
                     target=self._multiprocessing_while_sub_with_indexes,
                     kwargs={
                         'input_function': self.function,
                         'function_kwargs': self.function_kwargs,
                         'data': self.input_data,
                         'data_len': self.data_len,
+                        'nb_processes': self.nb_processes,
                         'shared_value': shared_value,
                         'output_queue': output_queue,
+                        'output_size': self.output_size,
                     },
                 )
-                p.start()
-                processes[i] = p
         else:
             for i in range(self.nb_processes):
-                p = mp.Process(
+                processes[i] = self._start_process(
+                    index=i,
                     target=self._multiprocessing_while_sub_without_indexes,
                     kwargs={
                         'input_function': self.function,
                         'function_kwargs': self.function_kwargs,
                         'data': self.input_data,
                         'data_len': self.data_len,
+                        'nb_processes': self.nb_processes,
                         'shared_value': shared_value,
                         'output_queue': output_queue,
+                        'output_size': self.output_size,
                     },
                 )
-                p.start()
-                processes[i] = p
-        for p in processes: p.join()
+        return processes
     
     @staticmethod
     def _multiprocessing_while_sub_with_indexes_all_data(
@@ -799,8 +966,10 @@ class MultiProcessingUtils:
             function_kwargs: dict[str, any],
             data: dict[str, any] | np.ndarray,
             data_len: int,
-            shared_value: mp.managers.ValueProxy,
+            nb_processes: int,
+            shared_value: mp.sharedctypes.Synchronized,
             output_queue: mp.queues.Queue,
+            output_size: int | None,
         ) -> None:
         """ #TODO: change docstring
         To run a process in a while loop given an input and output queue. The data is accessed
@@ -814,7 +983,10 @@ class MultiProcessingUtils:
             data (dict[str, any]): the shared memory information to point to the data.
             input_queue (mp.queues.Queue): to get the identifier to know what part of the data is
                 being processed.
-            output_queue (mp.queues.Queue): to save the identifier and the process result.
+            output_queue (mp.queues.Queue): to save the list of the identifiers and the
+                corresponding process results.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
         """
 
         shm = None
@@ -822,17 +994,21 @@ class MultiProcessingUtils:
             shm, data = MultiProcessing.open_shared_memory(data)
         
         # Run
+        results = []
         while True:
-            value = shared_value.value
-            if value >= data_len: break
-            shared_value.value += 1
+            indexes = MultiProcessingUtils._next_indexes(shared_value, data_len, nb_processes)
+            if not indexes: break
 
-            # Get result
-            result = input_function(data, value, **function_kwargs)
-            # Save result
-            output_queue.put((value, result))    
+            for value in indexes:
+                # Get result
+                result = input_function(data, value, **function_kwargs)
+                # Save result
+                results.append((value, MultiProcessingUtils._pack_output(result, output_size)))
 
-        if shm is not None: shm.close()
+        # Save results (one queue put per process)
+        output_queue.put(results)
+
+        if shm is not None: MultiProcessingUtils._close_shared_memory(shm, output_queue)
 
     @staticmethod
     def _multiprocessing_while_sub_without_indexes_all_data(
@@ -840,8 +1016,10 @@ class MultiProcessingUtils:
             function_kwargs: dict[str, any],
             data: dict[str, any] | np.ndarray,
             data_len: int,
-            shared_value: mp.managers.ValueProxy,
+            nb_processes: int,
+            shared_value: mp.sharedctypes.Synchronized,
             output_queue: mp.queues.Queue,
+            output_size: int | None,
         ) -> None:
         """ #TODO: change the docstring.
         To run a process in a while loop given an input and output queue. The data is accessed
@@ -852,7 +1030,10 @@ class MultiProcessingUtils:
             function_kwargs (dict[str, any]): the keyword arguments for the function to be
                 multiprocessed.
             data (dict[str, any]): the shared memory information to point to the data.
-            output_queue (mp.queues.Queue): to save the identifier and the process result.
+            output_queue (mp.queues.Queue): to save the list of the identifiers and the
+                corresponding process results.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
         """
 
         shm = None
@@ -860,17 +1041,21 @@ class MultiProcessingUtils:
             shm, data = MultiProcessing.open_shared_memory(data)
         
         # Run
+        results = []
         while True:
-            value = shared_value.value
-            if value >= data_len: break
-            shared_value.value += 1
+            indexes = MultiProcessingUtils._next_indexes(shared_value, data_len, nb_processes)
+            if not indexes: break
+
+            for value in indexes:
+                # Get result
+                result = input_function(data, **function_kwargs)
+                # Save result
+                results.append((value, MultiProcessingUtils._pack_output(result, output_size)))
 
-            # Get result
-            result = input_function(data, **function_kwargs)
-            # Save result
-            output_queue.put((value, result))
+        # Save results (one queue put per process)
+        output_queue.put(results)
 
-        if shm is not None: shm.close()
+        if shm is not None: MultiProcessingUtils._close_shared_memory(shm, output_queue)
 
     @staticmethod
     def _multiprocessing_while_sub_with_indexes(
@@ -878,8 +1063,10 @@ class MultiProcessingUtils:
             function_kwargs: dict[str, any],
             data: dict[str, any] | np.ndarray,
             data_len: int,
-            shared_value: mp.managers.ValueProxy,
+            nb_processes: int,
+            shared_value: mp.sharedctypes.Synchronized,
             output_queue: mp.queues.Queue,
+            output_size: int | None,
         ) -> None:
         """
         To run a process in a while loop given an input and output queue.
@@ -892,7 +1079,10 @@ class MultiProcessingUtils:
                 multiprocessed.
             input_queue (mp.queues.Queue): to get the identifier and the corresponding data to be
                 multiprocessed.
-            output_queue (mp.queues.Queue): to save the identifier and the process result.
+            output_queue (mp.queues.Queue): to save the list of the identifiers and the
+                corresponding process results.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
         """
 
         shm = None
@@ -900,18 +1090,21 @@ class MultiProcessingUtils:
             shm, data = MultiProcessing.open_shared_memory(data)
         
         # Run
+        results = []
         while True:
-            print('once', flush=True)
-            value = shared_value.value
-            if value >= data_len: break
-            shared_value.value += 1
+            indexes = MultiProcessingUtils._next_indexes(shared_value, data_len, nb_processes)
+            if not indexes: break
 
-            # Get result
-            result = input_function(data[value], value, **function_kwargs)
-            # Save result
-            output_queue.put((value, result))       
+            for value in indexes:
+                # Get result
+                result = input_function(data[value], value, **function_kwargs)
+                # Save result
+                results.append((value, MultiProcessingUtils._pack_output(result, output_size)))
 
-        if shm is not None: shm.close()
+        # Save results (one queue put per process)
+        output_queue.put(results)
+
+        if shm is not None: MultiProcessingUtils._close_shared_memory(shm, output_queue)
 
     @staticmethod
     def _multiprocessing_while_sub_without_indexes(
@@ -919,8 +1112,10 @@ class MultiProcessingUtils:
             function_kwargs: dict[str, any],
             data: dict[str, any] | np.ndarray,
             data_len: int,
-            shared_value: mp.managers.ValueProxy,
+            nb_processes: int,
+            shared_value: mp.sharedctypes.Synchronized,
             output_queue: mp.queues.Queue,
+            output_size: int | None,
         ) -> None:
         """
         To run a process in a while loop given an input and output queue.
@@ -931,7 +1126,10 @@ class MultiProcessingUtils:
                 multiprocessed.
             input_queue (mp.queues.Queue): to get the identifier and the corresponding data to be
                 multiprocessed.
-            output_queue (mp.queues.Queue): to save the identifier and the process result.
+            output_queue (mp.queues.Queue): to save the list of the identifiers and the
+                corresponding process results.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. None when run in the main process.
         """
 
         shm = None
@@ -939,17 +1137,236 @@ class MultiProcessingUtils:
             shm, data = MultiProcessing.open_shared_memory(data)
         
         # Run
+        results = []
+        while True:
+            indexes = MultiProcessingUtils._next_indexes(shared_value, data_len, nb_processes)
+            if not indexes: break
+
+            for value in indexes:
+                # Get result
+                result = input_function(data[value], **function_kwargs)
+                # Save result
+                results.append((value, MultiProcessingUtils._pack_output(result, output_size)))
+
+        # Save results (one queue put per process)
+        output_queue.put(results)
+
+        if shm is not None: MultiProcessingUtils._close_shared_memory(shm, output_queue)
+
+    def _start_process(
+            self,
+            index: int,
+            target: typing.Callable[..., None],
+            kwargs: dict,
+        ) -> mp.Process | None:
+        """
+        Starts a process running the given target. When 'in_main_process' is True and only one
+        process is needed, the target is directly run in the main process as creating a process
+        (and pickling its inputs and outputs) would only add overhead.
+        If 'pin_processes' is True, the process is pinned to one of the available CPU cores.
+
+        Args:
+            index (int): the index of the process (used to choose the CPU core).
+            target (typing.Callable[..., None]): the process sub function to run.
+            kwargs (dict): the keyword arguments of the target.
+
+        Returns:
+            mp.Process | None: the started process. None when the target was run in the main
+                process (its results are then already in the output queue).
+        """
+
+        if self.main_process:
+            target(**kwargs)
+            return None
+
+        p = self.context.Process(target=target, kwargs=kwargs)
+        p.start()
+
+        # CPU affinity
+        if self.pin_processes:
+            cores = sorted(os.sched_getaffinity(0))
+            try:
+                os.sched_setaffinity(p.pid, {cores[index % len(cores)]})
+            except ProcessLookupError:
+                pass  # process already finished
+        return p
+
+    @staticmethod
+    def _get_output(output_queue: mp.queues.Queue, processes: list[mp.Process]) -> any:
+        """
+        Gets the next item from the output queue. While waiting, it checks that none of the
+        processes ended with an error so that a crashed process doesn't block the main process
+        forever.
+
+        Args:
+            output_queue (mp.queues.Queue): the results gotten from the multiprocessing.
+            processes (list[mp.Process]): the processes that put their results in the queue.
+
+        Raises:
+            Exception: if a process ended with an error before giving its results.
+
+        Returns:
+            any: the next item of the output queue.
+        """
+
         while True:
-            value = shared_value.value
-            if value >= data_len: break
-            shared_value.value += 1
+            try:
+                return output_queue.get(timeout=1)
+            except queue.Empty:
+                exitcodes = [p.exitcode for p in processes if p.exitcode]
+                if exitcodes:
+                    for p in processes: p.terminate()
+                    raise Exception(
+                        "\033[1;31mA multiprocessing process ended before giving its results. "
+                        f"Exit code: {exitcodes[0]}.\033[0m"
+                    )
+
+    @staticmethod
+    def _copy_view(result: any, data: np.ndarray | list[np.ndarray]) -> any:
+        """
+        Copies a result that can be a view of the given data so that it stays valid once the
+        data buffer(s) are closed. Any other result is returned as is.
 
-            # Get result
-            result = input_function(data[value], **function_kwargs)
-            # Save result
-            output_queue.put((value, result))           
+        Args:
+            result (any): the result of the multiprocessed function.
+            data (np.ndarray | list[np.ndarray]): the data view(s) of the shared memory buffer(s).
+
+        Returns:
+            any: the result or, if it may share memory with the data, a copy of it.
+        """
 
-        if shm is not None: shm.close()     
+        if isinstance(result, np.ndarray):
+            # Bounds check only (cheap), a false positive just means an unneeded copy
+            buffers = data if isinstance(data, list) else [data]
+            if any(np.may_share_memory(result, buffer) for buffer in buffers):
+                return result.copy()
+        return result
+
+    @staticmethod
+    def _discard_outputs(output_queue: mp.queues.Queue) -> None:
+        """
+        Empties the output queue after an error. The results that were saved inside a shared
+        memory object are unlinked so that they don't leak.
+
+        Args:
+            output_queue (mp.queues.Queue): the results gotten from the multiprocessing.
+        """
+
+        while True:
+            try:
+                item = output_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            # While loop processes put a list of (identifier, result)
+            for _, result in (item if isinstance(item, list) else [item]):
+                if isinstance(result, SharedMemoryResult):
+                    shm, _ = MultiProcessing.open_shared_memory(result)
+                    shm.close()
+                    shm.unlink()
+
+    @staticmethod
+    def _close_shared_memory(
+            shm: mp.shared_memory.SharedMemory | SharedMemoryList,
+            output_queue: mp.queues.Queue,
+        ) -> None:
+        """
+        Closes the shared memory object(s) opened inside a process. As mp.Queue.put() only pickles
+        the results in a background feeder thread, the output queue is first flushed. Otherwise,
+        a result that is a view of the shared memory buffer (e.g. the function returning its data
+        argument) would be pickled after the buffer was unmapped.
+
+        Args:
+            shm (mp.shared_memory.SharedMemory | SharedMemoryList): the shared memory object(s)
+                opened by the process.
+            output_queue (mp.queues.Queue): the queue in which the process put its results.
+        """
+
+        if isinstance(output_queue, mp.queues.Queue):
+            output_queue.close()
+            output_queue.join_thread()
+        shm.close()
+
+    @staticmethod
+    def _next_indexes(
+            shared_value: mp.sharedctypes.Synchronized,
+            data_len: int,
+            nb_processes: int,
+        ) -> range:
+        """
+        Gives the next data indexes to be processed and increments the shared counter. The read and
+        the increment are done while holding the counter lock so that two processes can never get
+        the same index. As the counter lives in shared memory, this is a futex acquisition and not
+        a round-trip to a manager server process.
+        The number of indexes given decreases with the remaining data (guided self-scheduling):
+        large chunks at first so that the counter is rarely accessed, and single indexes at the
+        end so that the processes still finish at about the same time.
+
+        Args:
+            shared_value (mp.sharedctypes.Synchronized): the shared counter of the next data index.
+            data_len (int): the length of the data to be processed.
+            nb_processes (int): the number of processes sharing the counter.
+
+        Returns:
+            range: the data indexes that the calling process needs to work on. Empty when all the
+                data has already been given.
+        """
+
+        with shared_value.get_lock():
+            start = shared_value.value
+            if start >= data_len: return range(0)
+            stop = start + max(1, (data_len - start) // (2 * nb_processes))
+            shared_value.value = stop
+        return range(start, stop)
+
+    @staticmethod
+    def _pack_output(result: any, output_size: int | None) -> any:
+        """
+        Prepares a process result before it is put in the output queue. Large np.ndarray results
+        are copied inside a new shared memory object and only the corresponding information
+        dictionary is sent through the queue (instead of pickling the whole array through it).
+        Any other result is returned as is.
+
+        Args:
+            result (any): the result of the multiprocessed function.
+            output_size (int | None): the minimum size (in bytes) of an np.ndarray result for it
+                to be sent through shared memory. When None, the result is returned as is.
+
+        Returns:
+            any: the result itself or, for a large np.ndarray, the SharedMemoryResult information
+                needed to access it.
+        """
+
+        if (
+            output_size is not None
+            and isinstance(result, np.ndarray)
+            and not result.dtype.hasobject
+            and result.nbytes >= output_size
+        ):
+            _, info = MultiProcessing.create_shared_memory(result)
+            return SharedMemoryResult(info)
+        return result
+
+    @staticmethod
+    def _unpack_output(result: any) -> any:
+        """
+        Gets back a process result after it was taken from the output queue. If the result was
+        saved inside a shared memory object, the array is copied out of it and the shared memory
+        object is unlinked.
+
+        Args:
+            result (any): the result gotten from the output queue.
+
+        Returns:
+            any: the result of the multiprocessed function.
+        """
+
+        if isinstance(result, SharedMemoryResult):
+            shm, data = MultiProcessing.open_shared_memory(result)
+            result = data.copy()
+            shm.close()
+            shm.unlink()
+        return result
 
     @staticmethod
     def shared_memory_multiple(
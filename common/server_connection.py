@@ -10,10 +10,6 @@ import shutil
 import tempfile
 import subprocess
 
-# IMPORTS alias
-import multiprocessing as mp
-
-
 
 class SSHMirroredFilesystem:
     """
@@ -39,8 +35,6 @@ class SSHMirroredFilesystem:
     # DIRECTORIES
     directory_path = tempfile.mkdtemp()  # path to the main directory of the temporary filesystem
     directory_list: list[str] = []  # subdirectory names that were created. 
-    # Locks for the list 
-    mp_lock = mp.Lock()
 
     def __init__(
             self,
@@ -119,8 +113,9 @@ class SSHMirroredFilesystem:
     def _check_connection(self, process: subprocess.Popen) -> bool:
         """
         Checks if the ssh master connection was created (i.e. if the control socket file exists).
-        If not, waits 100ms before checking again. Also looks if the process finished and catches
-        the corresponding error.
+        If not, waits before checking again (starting at 5ms and doubling up to 100ms so that a fast
+        connection isn't delayed). Also looks if the process finished and catches the corresponding
+        error.
 
         Args:
             process (subprocess.Popen): the bash process for creating the SSH master connection.
@@ -134,6 +129,7 @@ class SSHMirroredFilesystem:
         """
 
         start_time = time.time()
+        wait = 0.005
 
         while time.time() - start_time < self.timeout:
             if os.path.exists(self.ctrl_socket_filepath): return True  # connection established.
@@ -145,7 +141,8 @@ class SSHMirroredFilesystem:
                     raise Exception(
                         f'\033[1;31mSSH connection failed. Error: {error_message.strip()}\033[0m'
                     )
-            time.sleep(0.1)
+            time.sleep(wait)
+            wait = min(2 * wait, 0.1)
         return False
 
     def mirror(self, remote_filepaths: str | list[str], strip_level: int = 2) -> str | list[str]:
@@ -474,38 +471,31 @@ class SSHMirroredFilesystem:
     @classmethod
     def _append(cls, foldername: str) -> None:
         """
-        To append to the class level attribute list containing the temporary subfolders created. It
-        does a preliminary check to see if you are multiprocessing to decide if to use a lock.
-        While initially, this also took into account if you are multithreading, now it doesn't as,
-        after further thinking, I don't see why anyone would use this code in a thread as the
-        fetching is not really I/O bound but more dependent on the maximum Wi-Fi connection speed.
-        Furthermore, as the default is to to use compression when transferring files, it will be
-        CPU bound before becoming I/O bound.
+        To append to the class level attribute list containing the temporary subfolders created.
+        No lock is used: each process has its own copy of the list (so there is nothing shared to
+        protect) and, inside a process, list.append() is already atomic.
 
         Args:
             foldername (str):  name of the newly created temporary subfolder.
         """
 
-        is_multiprocessing = (os.getpid() != os.getppid())
-        if is_multiprocessing:
-            with cls.mp_lock: cls.directory_list.append(foldername)
-        else:
-            cls.directory_list.append(foldername)
+        cls.directory_list.append(foldername)
     
     @classmethod
-    def _pop(cls, directories : list[str] = []) -> None:
+    def _pop(cls, directories : list[str] | None = None) -> None:
         """
         To take away, from the class level directory list, the directory names that where deleted.
 
         Args:
-            directories (list[str], optional): the directory names to take away from the list.
-                Defaults to [] (empties the list completely).
+            directories (list[str] | None, optional): the directory names to take away from the
+                list. Defaults to None (empties the list completely).
         """
         
-        if directories == []:
+        if directories is None:
             cls.directory_list = []
         else:
-            cls.directory_list = [name for name in cls.directory_list if name not in directories]
+            removed = set(directories)
+            cls.directory_list = [name for name in cls.directory_list if name not in removed]
 
     @staticmethod
     def _strip(fullpath: str, strip_level: int) -> str:
@@ -3,6 +3,7 @@ To test the MultiProcessing Python file classes.
 """
 
 # Imports
+import os
 import typing
 # Aliases
 import numpy as np
@@ -47,6 +48,109 @@ class Test:
         # shm.unlink()
         # print(results)
 
+    def shared_memory_views(self):
+        """
+        The multiprocessed function returns its data argument, i.e. a view of the shared memory
+        buffer. The results need to stay valid after the buffers are closed, including when the
+        function is run in the main process.
+        """
+
+        values = np.arange(1000, dtype='float64').reshape(100, 10)
+
+        for processes, in_main_process in ((1, False), (1, True), (4, False)):
+            for identifier in (True, False):
+                for while_True in (True, False):
+                    for transfer_all_data in (True, False):
+                        results = MultiProcessing.multiprocessing(
+                            input_data=values,
+                            function=self.function if identifier else self.function_no_index,
+                            function_kwargs={'random': False},
+                            processes=processes,
+                            create_shared_memory=True,
+                            in_main_process=in_main_process,
+                            transfer_all_data=transfer_all_data,
+                            identifier=identifier,
+                            while_True=while_True,
+                        )
+
+                        if transfer_all_data:
+                            assert all(np.array_equal(result, values) for result in results)
+                        elif while_True:
+                            assert np.array_equal(np.stack(results), values)
+                        else:
+                            assert np.array_equal(np.concatenate(results), values)
+
+        # Shared memory opened by the main process itself
+        shm, info = MultiProcessing.create_shared_memory(values)
+        results = MultiProcessing.multiprocessing(
+            input_data=info,
+            function=self.function_no_index,
+            function_kwargs={'random': False},
+            processes=1,
+            shared_memory_input=True,
+            while_True=True,
+            in_main_process=True,
+        )
+        shm.unlink()
+        assert np.array_equal(np.stack(results), values)
+
+    def shared_memory_results(self):
+        """
+        Results of at least MultiProcessingUtils.shared_memory_output_size bytes (1 MiB) are sent
+        through shared memory. Their values need to be right and no shared memory segment should
+        be left afterwards.
+        """
+
+        values = np.arange(4 * 2 ** 17, dtype='float64').reshape(4, 2 ** 17)  # 1 MiB per row
+        segments = set(os.listdir('/dev/shm'))
+
+        for while_True in (True, False):
+            results = MultiProcessing.multiprocessing(
+                input_data=values,
+                function=self.function_copy,
+                function_kwargs={},
+                processes=4,
+                while_True=while_True,
+            )
+
+            if while_True:
+                assert np.array_equal(np.stack(results), values + 1)
+            else:
+                assert np.array_equal(np.concatenate(results), values + 1)
+            assert set(os.listdir('/dev/shm')) == segments
+
+    @staticmethod
+    def function_copy(data: np.ndarray) -> np.ndarray:
+
+        return data + 1
+
+    def main_process_option(self):
+        """
+        With only one process, the function still runs in a subprocess by default so that in-place
+        changes don't reach the inputted data. They only do when 'in_main_process' is True.
+        """
+
+        for in_main_process in (False, True):
+            values = np.ones(10)
+            MultiProcessing.multiprocessing(
+                input_data=values,
+                function=self.function_in_place,
+                function_kwargs={},
+                processes=1,
+                in_main_process=in_main_process,
+            )
+            assert np.all(values == 0) == in_main_process
+
+    @staticmethod
+    def function_in_place(data: np.ndarray) -> None:
+
+        data *= 0
+
+    @staticmethod
+    def function_no_index(data: any, random: bool) -> any:
+
+        return data
+
     @staticmethod
     def function(data: any, index: int | tuple[int, int], random: bool) -> any:
 
@@ -59,4 +163,7 @@ class Test:
 if __name__=='__main__':
     
     test = Test()
-    test.trying_it_out()
\ No newline at end of file
+    test.trying_it_out()
+    test.shared_memory_views()
+    test.shared_memory_results()
+    test.main_process_option()
\ No newline at end of file